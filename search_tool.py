@@ -1,17 +1,590 @@
 """Simple file keyword search tool.
 
 API:
-- search_in_file(path: str, keyword: str, case_insensitive: bool=False, use_regex: bool=False) -> list[dict]
+- search_in_file(path: str, keyword: str, case_insensitive: bool=False, use_regex: bool=False, errors: str="strict", limit: int=None) -> list[dict]
+- search_in_file_columnar(path: str, keyword: str, case_insensitive: bool=False, use_regex: bool=False, errors: str="strict", limit: int=None) -> dict
+- search_in_file_parallel(path: str, keyword: str, case_insensitive: bool=False, workers: int=None, errors: str="strict") -> list[dict]
+- search_keywords_in_file(path: str, keywords: list[str], case_insensitive: bool=False, errors: str="strict") -> dict[str, list[dict]]
 
 Returns a list of dicts: {"line": int, "text": str} for each line matching the keyword or regex.
+The columnar variant returns the same data as {"lines": array('q'), "texts": list[str]}, which
+avoids a dict per match for searches with many hits.
 By default the search is a case-sensitive substring search. You can enable case-insensitive
-matching and/or regular-expression matching with the optional flags.
+matching and/or regular-expression matching with the optional flags. With `limit`, the scan
+stops as soon as that many matching lines have been found.
+
+Substring searches run directly over the raw bytes of the file (memory-mapped for large
+files) and only decode the lines that actually match. When the `hyperscan` bindings are
+installed, case-insensitive and multi-keyword searches use its vectorized literal matcher.
+Otherwise batch searches for several keywords scan the file once with an Aho-Corasick
+automaton when `pyahocorasick` is installed.
 """
-from typing import List, Dict
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import accumulate, compress, islice, repeat
+from typing import Any, Callable, Iterator, List, Dict, Optional, Tuple, Union
+import mmap
+import os
 import re
+import threading
+
+try:
+    from re import _parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+
+try:
+    import ahocorasick
+except ImportError:  # optional: pip install pyahocorasick
+    ahocorasick = None
+
+try:
+    import hyperscan
+except ImportError:  # optional: pip install hyperscan
+    hyperscan = None
+
+# Files smaller than this are read into memory in one go; mapping them costs more than it saves.
+MMAP_THRESHOLD = 16 * 4096
+
+# Files smaller than this are not worth splitting across worker processes.
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+
+# Above this many bytes, line numbers for dense hits come from a numpy newline index.
+NUMPY_THRESHOLD = 1 << 20
+_NUMPY_BLOCK = 64 << 20
+
+# Block size for chunked work: streaming reads, counting newlines inside a memory map
+# (mmap has no count()) and ASCII case folding for case-insensitive searches.
+_BLOCK = 1 << 20
+
+# Substrings, and the literal prefix of a regex, are only searched hit by hit when fewer
+# than one line in _HIT_DENSITY contains them (judged from the first _DENSITY_SAMPLE
+# bytes); denser data is cheaper to split into lines.
+_HIT_DENSITY = 8
+_DENSITY_SAMPLE = 64 << 10
+
+# The only non-ASCII characters str.lower() turns into ASCII letters: KELVIN SIGN into 'k'
+# and LATIN CAPITAL LETTER I WITH DOT ABOVE into 'i' plus a combining dot. ASCII case
+# folding on bytes misses them.
+_UNICODE_FOLDS = ((b'k', '\u212a'.encode('utf-8')), (b'i', '\u0130'.encode('utf-8')))
+
+Buffer = Union[bytes, mmap.mmap]
+
+# Matches stored column-wise: {'lines': array('q') of 1-based line numbers, 'texts': [str, ...]}.
+Columns = Dict[str, Any]
+
+
+def _new_columns() -> Columns:
+    return {'lines': array('q'), 'texts': []}
+
+
+def _as_dicts(columns: Columns) -> List[Dict]:
+    return [{'line': line, 'text': text} for line, text in zip(columns['lines'], columns['texts'])]
+
+
+@lru_cache(maxsize=256)
+def _compile(pattern: Union[str, bytes], flags: int) -> re.Pattern:
+    """Compile `pattern`, reusing the compiled object across calls with the same pattern and flags."""
+    return re.compile(pattern, flags)
+
+
+@lru_cache(maxsize=256)
+def _literal_prefix(pattern: str, flags: int) -> bytes:
+    """UTF-8 bytes of the literal text every match of `pattern` starts with (b'' if none).
+
+    Zero-width anchors such as ^ and \\b are skipped. The prefix stops at the first
+    non-literal token, line break or lone surrogate, and is empty for case-insensitive
+    patterns.
+    """
+    parsed = _sre_parse.parse(pattern, flags)
+    if parsed.state.flags & re.IGNORECASE:
+        return b''
+    chars = []
+    for op, arg in parsed:
+        if op == _sre_parse.AT:
+            continue
+        if op != _sre_parse.LITERAL or arg in (0x0a, 0x0d) or 0xd800 <= arg <= 0xdfff:
+            break
+        chars.append(chr(arg))
+    return ''.join(chars).encode('utf-8')
+
+
+def _open_advised(path: str, buffering: int = -1):
+    """Open `path` for binary reading and tell the kernel it will be read sequentially.
+
+    The hint widens the readahead window, which matters for files much larger than
+    the page cache. It is skipped on platforms without posix_fadvise (e.g. Windows).
+    """
+    fh = open(path, 'rb', buffering=buffering)
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fh.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+    return fh
+
+
+def _available_memory() -> int:
+    """Best-effort amount of free physical memory in bytes, or 0 if unknown."""
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return 0
+
+
+def _advise_mmap(mm: mmap.mmap, size: int, prefetch: bool = True) -> None:
+    """Hint sequential access for a mapping, and prefetch it when it fits in free memory.
+
+    Pass `prefetch=False` when the scan may stop early, so that the whole file is not
+    read in ahead of it.
+    """
+    if not hasattr(mm, 'madvise'):
+        return
+    try:
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        if prefetch and hasattr(mmap, 'MADV_WILLNEED') and size < _available_memory():
+            mm.madvise(mmap.MADV_WILLNEED)
+    except OSError:
+        pass
+
+
+def _count_newlines(data: Buffer, start: int, end: int) -> int:
+    """Count b'\\n' bytes in data[start:end] without copying more than a block at a time."""
+    if isinstance(data, bytes):
+        return data.count(b'\n', start, end)
+    total = 0
+    for block_start in range(start, end, _BLOCK):
+        total += data[block_start:min(block_start + _BLOCK, end)].count(b'\n')
+    return total
+
+
+def _has_lone_cr(data: Buffer, start: int, end: int) -> bool:
+    """Whether data[start:end] has a \\r not followed by \\n, which text mode treats as a line break."""
+    if data.find(b'\r', start, end) < 0:
+        return False
+    if isinstance(data, bytes):
+        return data.count(b'\r', start, end) != data.count(b'\r\n', start, end + 1)
+    for block_start in range(start, end, _BLOCK):
+        block_end = min(block_start + _BLOCK, end)
+        # One byte past the block, so a \r\n straddling the boundary is seen whole.
+        block = data[block_start:block_end + 1]
+        if block.count(b'\r', 0, block_end - block_start) != block.count(b'\r\n'):
+            return True
+    return False
+
+
+def _has_unicode_fold(data: Buffer, needles: List[bytes], start: int, end: int) -> bool:
+    """Whether data[start:end] has a character that str.lower() folds into an ASCII letter of
+    one of the lowercased `needles`, so that ASCII case folding would miss a match."""
+    for letter, char in _UNICODE_FOLDS:
+        if any(letter in needle for needle in needles):
+            # Looking for the lead byte alone runs at memchr speed and rules out most files.
+            pos = data.find(char[:1], start, end)
+            if pos >= 0 and data.find(char, pos, end) >= 0:
+                return True
+    return False
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """Import numpy on first use, or return None when it is not installed."""
+    try:
+        import numpy
+    except ImportError:  # optional: pip install numpy
+        return None
+    return numpy
+
+
+def _line_numbers(data: Buffer, offsets: List[int], start: int = 0) -> array:
+    """Translate sorted byte offsets in `data` into 1-based line numbers counted from `start`.
+
+    Normally only the newlines between consecutive offsets are counted, so no index of
+    the whole buffer is built. When there are many offsets over a large span that costs
+    one Python step per offset, and a vectorized numpy newline index is used instead.
+    """
+    span = offsets[-1] - start if offsets else 0
+    np = _numpy() if span > NUMPY_THRESHOLD and len(offsets) * 1024 > span else None
+    if np is not None:
+        return _line_numbers_numpy(np, data, offsets, start)
+
+    numbers = array('q')
+    lineno, counted = 1, start
+    for offset in offsets:
+        lineno += _count_newlines(data, counted, offset)
+        counted = offset
+        numbers.append(lineno)
+    return numbers
+
+
+def _line_numbers_numpy(np, data: Buffer, offsets: List[int], start: int) -> array:
+    """`_line_numbers` with the newline positions found by numpy, one _NUMPY_BLOCK at a time."""
+    offs = np.asarray(offsets, dtype=np.int64)
+    numbers = np.empty(len(offs), dtype=np.int64)
+    lineno = 1
+    lo = 0
+    block_start = start
+    while lo < len(offs):
+        block_end = min(block_start + _NUMPY_BLOCK, offsets[-1] + 1)
+        hi = int(np.searchsorted(offs, block_end))
+        newlines = np.flatnonzero(
+            np.frombuffer(data, dtype=np.uint8, count=block_end - block_start, offset=block_start) == 0x0A)
+        numbers[lo:hi] = lineno + np.searchsorted(newlines, offs[lo:hi] - block_start)
+        lineno += len(newlines)
+        lo, block_start = hi, block_end
+    return array('q', numbers.tobytes())
+
+
+def _decode_line(raw: bytes, errors: str = 'strict') -> str:
+    """Decode a matched line, dropping the `\\r` left behind by CRLF line endings."""
+    if raw.endswith(b'\r'):
+        raw = raw[:-1]
+    return raw.decode('utf-8', errors)
+
+
+def _normalize_ending(line: bytes) -> bytes:
+    """Turn a \\r\\n or \\r line ending into \\n, as universal-newlines text mode does."""
+    if line.endswith(b'\r\n'):
+        return line[:-2] + b'\n'
+    if line.endswith(b'\r'):
+        return line[:-1] + b'\n'
+    return line
+
+
+def _universal_newlines(text: str) -> str:
+    """Translate \\r\\n and lone \\r line endings in decoded `text` to \\n, as text mode does."""
+    if '\r' not in text:
+        return text
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def _iter_blocks(path: str) -> Iterator[bytes]:
+    """Yield the contents of `path` in blocks of roughly _BLOCK bytes that end on a line break.
+
+    The file is read in binary mode into a preallocated buffer. A \\r at the end of a
+    read is carried over with the unfinished last line, since a \\n may follow it. An
+    unfinished line is kept as a list of pieces and joined once its end arrives, so a
+    line longer than a block is not copied again on every read.
+    """
+    buf = bytearray(_BLOCK)
+    view = memoryview(buf)
+    pending: List[bytes] = []
+    with _open_advised(path, buffering=0) as fh:
+        while True:
+            n = fh.readinto(buf)
+            if not n:
+                break
+            cut = max(buf.rfind(b'\n', 0, n), buf.rfind(b'\r', 0, n - 1)) + 1
+            if not cut:
+                # A \r carried over from the previous read that no \n followed was a line break.
+                if pending and pending[-1].endswith(b'\r'):
+                    yield b''.join(pending)
+                    pending = []
+                pending.append(bytes(view[:n]))
+                continue
+            chunk = b''.join(pending + [view[:cut]])
+            pending = [bytes(view[cut:n])] if cut < n else []
+            yield chunk
+    if pending:
+        yield b''.join(pending)
+
+
+def _split_lines(chunk: bytes) -> List[bytes]:
+    """Split a block from `_iter_blocks` into raw lines, each ending in b'\\n' unless it is
+    the last line of the file.
+
+    Lines are split on \\n, \\r and \\r\\n and their endings normalized to \\n, exactly
+    like universal-newlines text mode, but nothing is decoded here.
+    """
+    return [_normalize_ending(line) for line in chunk.splitlines(keepends=True)]
+
+
+def _bytes_regex_safe(chunk: bytes) -> bool:
+    """Whether an ASCII bytes pattern matches `chunk` exactly like its str counterpart.
+
+    That holds for ASCII text, except for \\x1c-\\x1f, which str patterns treat as whitespace.
+    """
+    return chunk.isascii() and not any(sep in chunk for sep in (b'\x1c', b'\x1d', b'\x1e', b'\x1f'))
+
+
+def _lines_containing(chunk: bytes, needle: bytes, first: int) -> List[Tuple[int, bytes]]:
+    """`(line number, raw line)` for each line of `chunk` containing `needle`, numbered from `first`.
+
+    Lines are split on \\n only, so `chunk` must not contain a lone \\r; line endings are
+    normalized as in `_split_lines`. `needle` must not contain a line break.
+    """
+    hits: List[Tuple[int, bytes]] = []
+    lineno, line_start = first, 0
+    pos = chunk.find(needle)
+    while pos >= 0:
+        lineno += chunk.count(b'\n', line_start, pos)
+        start = max(chunk.rfind(b'\n', line_start, pos) + 1, line_start)
+        end = chunk.find(b'\n', pos) + 1 or len(chunk)
+        hits.append((lineno, _normalize_ending(chunk[start:end])))
+        lineno, line_start = lineno + 1, end
+        pos = chunk.find(needle, end)
+    return hits
+
+
+def _line_starts(lines: List[str]) -> List[int]:
+    """Offsets at which each of `lines` starts once they are joined back with newlines.
+
+    The list has one extra trailing entry (the start of the line after the last one),
+    so a 1-based line number `n` spans `line_starts[n - 1]:line_starts[n] - 1`.
+    """
+    return list(accumulate(map(len, lines), lambda start, length: start + length + 1, initial=0))
+
+
+def _scan_text_ci(text: str, keyword: str, limit: Optional[int] = None) -> Columns:
+    """Case-insensitive substring scan over a whole decoded file without a per-line loop."""
+    search = _compile(re.escape(keyword), re.IGNORECASE).search
+    text = _universal_newlines(text)
+    lines = text.split('\n')
+    line_starts = _line_starts(lines)
+
+    found = _new_columns()
+    add_line, add_text = found['lines'].append, found['texts'].append
+    size = len(text)
+    m = search(text)
+    while m and m.start() < size and (limit is None or len(found['texts']) < limit):
+        lineno = bisect_right(line_starts, m.start())
+        add_line(lineno)
+        add_text(lines[lineno - 1])
+        m = search(text, line_starts[lineno])
+
+    return found
+
+
+def _ci_finder(data: Buffer, needle: bytes, end: Optional[int] = None) -> Callable[[int], int]:
+    """Return a `find(pos)` for an ASCII case-insensitive search of `needle` in `data[:end]`.
+
+    Blocks of `data` are lowercased with bytes.lower() (ASCII only) and searched with
+    bytes.find, so there is no per-line allocation and no regex engine in the loop.
+    The folded block is kept between calls, so dense hits do not refold it.
+    """
+    needle = needle.lower()
+    overlap = max(len(needle) - 1, 0)
+    size = len(data) if end is None else end
+    block_start, folded = -_BLOCK, b''
+
+    def _find(pos: int) -> int:
+        nonlocal block_start, folded
+        while pos < size:
+            if not block_start <= pos < block_start + _BLOCK:
+                block_start = pos
+                # The overlap lets a match starting near the end of the block complete.
+                folded = data[pos:min(pos + _BLOCK + overlap, size)].lower()
+            i = folded.find(needle, pos - block_start)
+            if i >= 0:
+                return block_start + i
+            pos = block_start + _BLOCK
+        return -1
+
+    return _find
+
+
+@lru_cache(maxsize=64)
+def _hs_database(needles: Tuple[bytes, ...], ci: bool):
+    """Compile (and cache) a Hyperscan block-mode database matching `needles` literally."""
+    db = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    db.compile(expressions=list(needles), ids=list(range(len(needles))), elements=len(needles),
+               flags=hyperscan.HS_FLAG_CASELESS if ci else 0, literal=True)
+    return db
+
 
+_hs_local = threading.local()
 
-def search_in_file(path: str, keyword: str, case_insensitive: bool = False, use_regex: bool = False) -> List[Dict]:
+
+def _hs_scratch(db):
+    """The calling thread's Hyperscan scratch space for `db`.
+
+    A scratch space serves one scan at a time, so threads scanning the same cached
+    database concurrently cannot share the one it was compiled with.
+    """
+    try:
+        scratches = _hs_local.scratches
+    except AttributeError:
+        scratches = _hs_local.scratches = {}
+    entry = scratches.get(id(db))
+    if entry is None or entry[0] is not db:
+        # Databases evicted from the _hs_database cache are dropped along the way.
+        if len(scratches) >= _hs_database.cache_info().maxsize:
+            scratches.clear()
+        entry = scratches[id(db)] = (db, hyperscan.Scratch(db))
+    return entry[1]
+
+
+def _hs_scan(data: Buffer, needles: List[bytes], ci: bool, start: int = 0, end: Optional[int] = None,
+             limit: Optional[int] = None) -> Tuple[List[List[int]], List[List[int]]]:
+    """Scan `data[start:end]` once with Hyperscan.
+
+    Returns, for each needle, the offset of its first occurrence in every line that contains it,
+    and the offset of the \\n ending each of those lines (or `end` for the last line).
+    With `limit`, the scan is stopped once every needle has that many lines.
+    """
+    size = len(data) if end is None else end
+    db = _hs_database(tuple(needles), ci)
+    hits: List[List[int]] = [[] for _ in needles]
+    ends: List[List[int]] = [[] for _ in needles]
+    full = 0
+
+    def on_match(i: int, _from: int, to: int, _flags: int, _ctx) -> Optional[bool]:
+        nonlocal full
+        pos = start + to - len(needles[i])
+        line_ends = ends[i]
+        # Later occurrences on a line that already matched are skipped cheaply.
+        if not line_ends or pos > line_ends[-1]:
+            hits[i].append(pos)
+            line_end = data.find(b'\n', pos, size)
+            line_ends.append(line_end if line_end >= 0 else size)
+            if len(line_ends) == limit:
+                full += 1
+                # A true return value makes Hyperscan stop scanning.
+                return full == len(needles)
+        return None
+
+    if limit is not None and limit <= 0:
+        return hits, ends
+    with memoryview(data) as view, view[start:size] as window:
+        try:
+            db.scan(window, match_event_handler=on_match, scratch=_hs_scratch(db))
+        except hyperscan.ScanTerminated:
+            pass
+    return hits, ends
+
+
+def _scan(data: Buffer, needle: bytes, ci: bool, errors: str = 'strict',
+          start: int = 0, end: Optional[int] = None, limit: Optional[int] = None) -> Optional[Columns]:
+    """Find every line of `data[start:end]` containing `needle`, or the first `limit` of them.
+
+    `start` must be the beginning of a line; line numbers are counted from there.
+    When few lines match (judged from a sample), the scan jumps from hit to hit and
+    lines that do not match are never materialized; otherwise the data is split into
+    lines a block at a time.
+
+    Lines are split on \\n only. Returns None if a lone \\r, which text mode treats as
+    a line break, appears before the end of the last matching line (for dense data, of
+    the block holding it), or if a case-insensitive search comes across a character in
+    _UNICODE_FOLDS; the caller must then use the per-line path.
+    """
+    size = len(data) if end is None else end
+    sample = data[start:min(start + _DENSITY_SAMPLE, size)]
+    if ci:
+        needle, sample = needle.lower(), sample.lower()
+    if sample.count(needle) * _HIT_DENSITY >= sample.count(b'\n'):
+        found, hits_end = _scan_lines(data, needle, ci, errors, start, size, limit)
+    else:
+        found, hits_end = _scan_hits(data, needle, ci, errors, start, size, limit)
+    if _has_lone_cr(data, start, hits_end):
+        return None
+    scanned = hits_end if limit is not None and len(found['texts']) >= limit else size
+    if ci and _has_unicode_fold(data, [needle], start, scanned):
+        return None
+    return found
+
+
+def _scan_hits(data: Buffer, needle: bytes, ci: bool, errors: str, start: int, size: int,
+               limit: Optional[int]) -> Tuple[Columns, int]:
+    """`_scan` by jumping from one hit to the next; also returns where the last matching line ends.
+
+    The scan itself only records where matching lines start and end; line numbers are
+    worked out afterwards in one pass.
+    """
+    if ci and needle and hyperscan is not None:
+        # Hyperscan already reports one hit per line, along with where that line ends.
+        (positions,), (line_ends,) = _hs_scan(data, [needle], ci, start, size, limit)
+        line_starts = [max(data.rfind(b'\n', start, pos) + 1, start) for pos in positions]
+    else:
+        if ci:
+            _find = _ci_finder(data, needle, size)
+        else:
+            def _find(pos: int) -> int:
+                return data.find(needle, pos, size)
+
+        line_starts = []
+        line_ends = []
+        pos = _find(start)
+        # A hit at `size` is only possible for an empty needle and does not belong to a line.
+        while 0 <= pos < size and (limit is None or len(line_starts) < limit):
+            line_start = max(data.rfind(b'\n', start, pos) + 1, start)
+            line_end = data.find(b'\n', pos, size)
+            if line_end < 0:
+                line_end = size
+            line_starts.append(line_start)
+            line_ends.append(line_end)
+            pos = _find(line_end + 1)
+
+    found = {'lines': _line_numbers(data, line_starts, start),
+             'texts': [_decode_line(data[a:b], errors) for a, b in zip(line_starts, line_ends)]}
+    return found, line_ends[-1] + 1 if line_ends else start
+
+
+def _scan_lines(data: Buffer, needle: bytes, ci: bool, errors: str, start: int, size: int,
+                limit: Optional[int]) -> Tuple[Columns, int]:
+    """`_scan` for data where many lines match; also returns the end of the last block with a hit.
+
+    Each block is decoded and split on \\n once, and every line tested at C speed, which
+    for dense hits is cheaper than a Python step per hit. Blocks that do not decode are
+    tested as raw bytes instead. With `ci`, `needle` must already be lowercased.
+    """
+    word = needle.decode('utf-8')
+    found = _new_columns()
+    add_lines, texts = found['lines'].extend, found['texts']
+    lineno, pos, hits_end = 1, start, start
+    while pos < size and (limit is None or len(texts) < limit):
+        # Blocks end on a line break, or at the end of a line longer than a block.
+        cut = data.rfind(b'\n', pos, min(pos + _BLOCK, size)) + 1
+        if cut <= pos:
+            cut = data.find(b'\n', pos, size) + 1 or size
+        block = data[pos:cut]
+        try:
+            text = block.decode('utf-8', errors)
+        except UnicodeDecodeError:
+            # Only the matching lines have to decode.
+            lines = block.split(b'\n')
+            hay = block.lower().split(b'\n') if ci else lines
+            mask = list(map(bytes.count, hay, repeat(needle)))
+            decoded = map(_decode_line, compress(lines, mask), repeat(errors))
+        else:
+            if '\r' in text:
+                # A \r left over after this only matters if the result is discarded for a lone \r.
+                text = text.replace('\r\n', '\n')
+            lines = text.split('\n')
+            hay = text.lower().split('\n') if ci else lines
+            # count() rather than `in`: a method call through map() is cheaper than the operator.
+            mask = list(map(str.count, hay, repeat(word)))
+            decoded = compress(lines, mask)
+        if block.endswith(b'\n'):
+            # The empty piece after the final line break is not a line.
+            lines.pop()
+        numbers = list(compress(range(lineno, lineno + len(lines)), mask))
+        if limit is not None:
+            del numbers[limit - len(texts):]
+        if numbers:
+            add_lines(numbers)
+            texts.extend(islice(decoded, len(numbers)))
+            hits_end = cut
+        lineno += len(lines)
+        pos = cut
+    return found, hits_end
+
+
+def _mmap_search(path: str, needle: bytes, ci: bool, errors: str = 'strict',
+                 limit: Optional[int] = None) -> Optional[Columns]:
+    """Run `_scan` over the contents of `path`, memory-mapping files of at least MMAP_THRESHOLD bytes."""
+    with _open_advised(path) as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            return _scan(fh.read(), needle, ci, errors, limit=limit)
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            _advise_mmap(mm, size, prefetch=limit is None)
+            return _scan(mm, needle, ci, errors, limit=limit)
+
+
+def search_in_file(path: str, keyword: str, case_insensitive: bool = False, use_regex: bool = False,
+                   errors: str = 'strict', limit: Optional[int] = None) -> List[Dict]:
     """Search for `keyword` in file at `path`.
 
     Args:
@@ -19,39 +592,294 @@ def search_in_file(path: str, keyword: str, case_insensitive: bool = False, use_
         keyword: Substring or regex pattern to search for in each line.
         case_insensitive: If True, performs case-insensitive matching.
         use_regex: If True, interpret `keyword` as a regular expression.
+        errors: How UTF-8 decoding errors are handled, as for `bytes.decode`.
+        limit: If given, stop after this many matching lines instead of scanning the whole file.
 
     Returns:
         A list of dicts with keys `line` (1-based line number) and `text` (the full line without trailing newline).
 
     Raises:
         FileNotFoundError: If the file does not exist.
-        UnicodeDecodeError: If the file cannot be decoded with UTF-8.
+        UnicodeDecodeError: If `errors` is 'strict' and a matching line cannot be decoded with UTF-8.
         ValueError: If `use_regex` is True and the provided pattern is invalid.
     """
-    matches = []
+    return _as_dicts(search_in_file_columnar(path, keyword, case_insensitive, use_regex, errors, limit))
+
+
+def search_in_file_columnar(path: str, keyword: str, case_insensitive: bool = False, use_regex: bool = False,
+                            errors: str = 'strict', limit: Optional[int] = None) -> Columns:
+    """Like `search_in_file`, but return the matches column-wise.
+
+    Takes the same arguments and raises the same errors as `search_in_file`.
+
+    Returns:
+        A dict with `lines` (array of 1-based line numbers) and `texts` (list of the matching
+        lines without trailing newline), in file order.
+    """
+    # Plain substrings can be matched on raw bytes. Case folding on bytes only covers
+    # ASCII keywords, and keywords spanning a line break must keep the per-line semantics.
+    if not use_regex and '\n' not in keyword and '\r' not in keyword:
+        if not case_insensitive or keyword.isascii():
+            found = _mmap_search(path, keyword.encode('utf-8'), case_insensitive, errors, limit)
+            # None: lines are also broken at a lone \r, or case folding needs str.lower(),
+            # which only the per-line path handles.
+            if found is not None:
+                return found
+        # Small files are decoded in one go and searched without a per-line loop.
+        elif os.path.getsize(path) < MMAP_THRESHOLD:
+            with open(path, 'rb') as fh:
+                return _scan_text_ci(fh.read().decode('utf-8', errors), keyword, limit)
+
+    found = _new_columns()
+    # Where possible lines are matched as raw bytes and only the hits are decoded.
+    # `bytes_match` is always exact for literal keywords; for regexes only on blocks
+    # that pass _bytes_regex_safe.
+    bytes_match: Optional[Callable] = None
+    bytes_needs_check = False
+    # Matches a decoded line; not needed when bytes_match is always exact.
+    _matches: Optional[Callable] = None
+    prefix: Optional[bytes] = None
 
     if use_regex:
         flags = re.IGNORECASE if case_insensitive else 0
         try:
-            pattern = re.compile(keyword, flags)
+            _matches = _compile(keyword, flags).search
         except re.error as e:
             raise ValueError(f"invalid regex pattern: {e}")
 
+        # A line can only match if it contains the literal the pattern starts with, so
+        # lines without it can be skipped before the regex engine sees them. A single
+        # byte is too common to be worth looking for.
+        prefix = _literal_prefix(keyword, flags)
+        if len(prefix) < 2:
+            prefix = None
+
+        if keyword.isascii():
+            try:
+                bytes_match = _compile(keyword.encode('ascii'), flags).search
+                bytes_needs_check = True
+            except re.error:
+                # str-only syntax such as \u escapes or named characters.
+                pass
+    elif case_insensitive:
+        # Unlike re.IGNORECASE, which also matches e.g. 'ı' for 'i', str.lower() on both sides
+        # is exactly what a case-insensitive substring search means here.
+        folded = keyword.lower()
+
         def _matches(line: str) -> bool:
-            return bool(pattern.search(line))
+            return folded in line.lower()
     else:
-        if case_insensitive:
-            needle = keyword.lower()
+        needle = keyword.encode('utf-8')
+
+        def bytes_match(raw_line: bytes) -> bool:
+            return needle in raw_line
 
-            def _matches(line: str) -> bool:
-                return needle in line.lower()
+    if limit is not None and limit <= 0:
+        return found
+
+    add_line, add_text = found['lines'].append, found['texts'].append
+    texts = found['texts']
+    idx = 0
+    for chunk in _iter_blocks(path):
+        # Unless the block has a lone \r, its lines end at \n only, and when few of them
+        # hold the prefix they are picked out with find() instead of splitting the block.
+        if (prefix is not None
+                and chunk.count(prefix, 0, _DENSITY_SAMPLE) * _HIT_DENSITY < chunk.count(b'\n', 0, _DENSITY_SAMPLE)
+                and (b'\r' not in chunk or chunk.count(b'\r') == chunk.count(b'\r\n'))):
+            lines = _lines_containing(chunk, prefix, idx + 1)
+            idx += chunk.count(b'\n')
+        else:
+            raw_lines = _split_lines(chunk)
+            lines = enumerate(raw_lines, idx + 1)
+            idx += len(raw_lines)
+        use_bytes = bytes_match is not None and (not bytes_needs_check or _bytes_regex_safe(chunk))
+        for lineno, raw_line in lines:
+            if use_bytes:
+                if not bytes_match(raw_line):
+                    continue
+                line = raw_line.decode('utf-8', errors)
+            else:
+                line = raw_line.decode('utf-8', errors)
+                if not _matches(line):
+                    continue
+            add_line(lineno)
+            add_text(line.rstrip('\n'))
+            if len(texts) == limit:
+                return found
+
+    return found
+
+
+def _scan_range(path: str, needle: bytes, ci: bool, errors: str, start: int,
+                end: int) -> Tuple[Optional[Columns], int, bool]:
+    """Worker for `search_in_file_parallel`: scan one line-aligned byte range of `path`.
+
+    Returns the matches, numbered from the first line of the range (None if `_scan` gave
+    up), the number of newlines in the range so the caller can shift later ranges, and
+    whether the range has a lone \\r, which would shift them further.
+    """
+    with _open_advised(path) as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return (_scan(mm, needle, ci, errors, start, end), _count_newlines(mm, start, end),
+                _has_lone_cr(mm, start, end))
+
+
+def search_in_file_parallel(path: str, keyword: str, case_insensitive: bool = False,
+                            workers: Optional[int] = None, errors: str = 'strict') -> List[Dict]:
+    """Substring search like `search_in_file`, splitting large files across worker processes.
+
+    The file is cut into `workers` roughly equal byte ranges, each snapped to the next
+    line boundary and scanned in its own process (bytes.find holds the GIL, so threads
+    would not run in parallel). Files below PARALLEL_THRESHOLD, and searches that
+    cannot run on raw bytes, are delegated to `search_in_file`.
+
+    Args:
+        path: Path to the file to search.
+        keyword: Substring to search for in each line.
+        case_insensitive: If True, performs case-insensitive matching.
+        workers: Number of worker processes; defaults to the number of CPUs.
+        errors: How UTF-8 decoding errors are handled, as for `bytes.decode`.
+
+    Returns:
+        The same list `search_in_file` returns.
+    """
+    workers = workers or os.cpu_count() or 1
+    size = os.path.getsize(path)
+    if (workers < 2 or size < max(PARALLEL_THRESHOLD, MMAP_THRESHOLD)
+            or '\n' in keyword or '\r' in keyword or (case_insensitive and not keyword.isascii())):
+        return search_in_file(path, keyword, case_insensitive=case_insensitive, errors=errors)
+
+    with open(path, 'rb') as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        bounds = [0]
+        for i in range(1, workers):
+            cut = mm.find(b'\n', max(i * size // workers, bounds[-1]))
+            if cut < 0:
+                break
+            if cut + 1 < size:
+                bounds.append(cut + 1)
+        bounds.append(size)
+
+    n = len(bounds) - 1
+    needle = keyword.encode('utf-8')
+    with ProcessPoolExecutor(max_workers=n) as pool:
+        parts = pool.map(_scan_range, [path] * n, [needle] * n, [case_insensitive] * n, [errors] * n,
+                         bounds[:-1], bounds[1:])
+        found = _new_columns()
+        line_offset = 0
+        for part, newlines, lone_cr in parts:
+            if part is None or lone_cr:
+                return search_in_file(path, keyword, case_insensitive=case_insensitive, errors=errors)
+            found['lines'].extend(line + line_offset for line in part['lines'])
+            found['texts'].extend(part['texts'])
+            line_offset += newlines
+
+    return _as_dicts(found)
+
+
+def _ac_search(path: str, keywords: List[str], ci: bool, errors: str) -> Dict[str, List[Dict]]:
+    """Batch search with a pyahocorasick automaton over the decoded text of `path`."""
+    results: Dict[str, List[Dict]] = {kw: [] for kw in keywords}
+    automaton = ahocorasick.Automaton()
+    for i, kw in enumerate(keywords):
+        needle = kw.lower() if ci else kw
+        if needle in automaton:
+            automaton.get(needle).append(i)
         else:
-            def _matches(line: str) -> bool:
-                return keyword in line
+            automaton.add_word(needle, [i])
+    automaton.make_automaton()
 
-    with open(path, 'r', encoding='utf-8') as fh:
-        for idx, raw_line in enumerate(fh, start=1):
-            if _matches(raw_line):
-                matches.append({'line': idx, 'text': raw_line.rstrip('\n')})
+    with _open_advised(path) as fh:
+        text = _universal_newlines(fh.read().decode('utf-8', errors))
+    haystack = text.lower() if ci else text
+    lines = text.split('\n')
+    hay_lines = haystack.split('\n') if ci else lines
+    line_starts = _line_starts(hay_lines)
+
+    last_line = [0] * len(keywords)
+    for end_idx, ids in automaton.iter(haystack):
+        lineno = bisect_right(line_starts, end_idx)
+        for i in ids:
+            if last_line[i] != lineno:
+                last_line[i] = lineno
+                results[keywords[i]].append({'line': lineno, 'text': lines[lineno - 1]})
+
+    return results
+
+
+def _hs_search(path: str, keywords: List[str], ci: bool, errors: str) -> Optional[Dict[str, List[Dict]]]:
+    """Batch search with a Hyperscan database over the raw bytes of `path`.
+
+    Returns None if the file breaks lines at a lone \\r, or if case folding needs str.lower()
+    (see _UNICODE_FOLDS), neither of which this search handles.
+    """
+    with _open_advised(path) as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            return _hs_collect(fh.read(), keywords, ci, errors)
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            _advise_mmap(mm, size)
+            return _hs_collect(mm, keywords, ci, errors)
+
+
+def _hs_collect(data: Buffer, keywords: List[str], ci: bool, errors: str) -> Optional[Dict[str, List[Dict]]]:
+    hits, _ = _hs_scan(data, [kw.encode('utf-8') for kw in keywords], ci)
+    # Number every hit line once, in file order, whichever keywords it belongs to.
+    positions = sorted(set().union(*hits))
+    # Lines are split on \n only; a lone \r up to the last hit line would shift them.
+    if positions:
+        last_end = data.find(b'\n', positions[-1])
+        if _has_lone_cr(data, 0, last_end + 1 if last_end >= 0 else len(data)):
+            return None
+    if ci and _has_unicode_fold(data, [kw.lower().encode('utf-8') for kw in keywords], 0, len(data)):
+        return None
+    numbers = _line_numbers(data, positions)
+    lines: Dict[int, Tuple[int, str]] = {}
+    for pos, lineno in zip(positions, numbers):
+        line_start = data.rfind(b'\n', 0, pos) + 1
+        line_end = data.find(b'\n', pos)
+        if line_end < 0:
+            line_end = len(data)
+        lines[pos] = (lineno, _decode_line(data[line_start:line_end], errors))
+
+    return {kw: [{'line': lines[pos][0], 'text': lines[pos][1]} for pos in positions]
+            for kw, positions in zip(keywords, hits)}
+
+
+def search_keywords_in_file(path: str, keywords: List[str], case_insensitive: bool = False,
+                            errors: str = 'strict') -> Dict[str, List[Dict]]:
+    """Search for several keywords in file at `path` in a single pass.
+
+    Args:
+        path: Path to the file to search.
+        keywords: Substrings to search for in each line.
+        case_insensitive: If True, performs case-insensitive matching.
+        errors: How UTF-8 decoding errors are handled, as for `bytes.decode`.
+
+    Returns:
+        A dict mapping each keyword to the list `search_in_file` would return for it.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        UnicodeDecodeError: If `errors` is 'strict' and the file is not valid UTF-8.
+    """
+    results: Dict[str, List[Dict]] = {kw: [] for kw in keywords}
+    eligible = [kw for kw in results if kw and '\n' not in kw and '\r' not in kw]
+    batched: List[str] = []
+    if hyperscan is not None:
+        # Hyperscan folds case on bytes, which only matches str.lower() for ASCII.
+        batched = [kw for kw in eligible if not case_insensitive or kw.isascii()]
+        batch_search = _hs_search
+    elif ahocorasick is not None:
+        batched = eligible
+        batch_search = _ac_search
+    # Keywords that cannot be batched fall back to a dedicated scan.
+    for kw in results:
+        if kw not in batched:
+            results[kw] = search_in_file(path, kw, case_insensitive=case_insensitive, errors=errors)
+    if batched:
+        found = batch_search(path, batched, case_insensitive, errors)
+        if found is None:
+            found = {kw: search_in_file(path, kw, case_insensitive=case_insensitive, errors=errors)
+                     for kw in batched}
+        results.update(found)
 
-    return matches
+    return results
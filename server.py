@@ -1,11 +1,17 @@
+from anyio import to_thread
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Dict, Any, List
+from pydantic import BaseModel, ValidationError
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
 import uvicorn
 import pathlib
 import logging
 import os
+import sys
+import threading
+
+from search_tool import search_in_file_columnar, search_keywords_in_file
 
 logging.basicConfig(level=logging.INFO)
 app = FastAPI(title="MCP Keyword Search Server")
@@ -21,22 +27,36 @@ app.add_middleware(
 
 
 class MCPRequest(BaseModel):
-    tool: str
-    args: Dict[str, Any] = {}
+    """An /mcp request body: either JSON-RPC (`method`, `params`) or the legacy `tool`/`args` form.
+
+    Fields echoed back to the client are typed `Any` so they are returned exactly as sent.
+    """
+    jsonrpc: Any = "2.0"
+    id: Any = None
+    method: Any = None
+    params: Optional[Dict[str, Any]] = None
+    tool: Optional[str] = None
+    args: Optional[Dict[str, Any]] = None
 
 
+# The return annotation lets FastAPI serialize responses straight to JSON bytes with
+# pydantic-core instead of going through jsonable_encoder and json.dumps.
 @app.post("/mcp")
-async def mcp_endpoint(req: Request):
+async def mcp_endpoint(req: Request) -> Dict[str, Any]:
 
-    body = await req.json()
+    # Parsed and validated in one step by pydantic-core, without an intermediate dict.
+    try:
+        body = MCPRequest.model_validate_json(await req.body())
+    except ValidationError:
+        raise HTTPException(status_code=400, detail={"error": "Invalid request body"})
     logging.info("Received /mcp request body: %s", body)
 
     
-    if isinstance(body, dict) and "method" in body:
-        method = body.get("method")
-        jsonrpc = body.get("jsonrpc", "2.0")
-        req_id = body.get("id")
-        params = body.get("params", {})
+    if "method" in body.model_fields_set:
+        method = body.method
+        jsonrpc = body.jsonrpc
+        req_id = body.id
+        params = body.params or {}
 
        
         if method == "initialize":
@@ -69,10 +89,34 @@ async def mcp_endpoint(req: Request):
                                 "keyword": {
                                     "type": "string",
                                     "description": "Keyword to search for"
+                                },
+                                "limit": {
+                                    "type": "integer",
+                                    "minimum": 1,
+                                    "description": "Maximum number of matching lines to return"
                                 }
                             },
                             "required": ["file_path", "keyword"]
                         }
+                    },
+                    {
+                        "name": "search_keywords",
+                        "description": "Search for several keywords in a text file in a single pass (case-insensitive)",
+                        "inputSchema": {
+                            "type": "object",
+                            "properties": {
+                                "file_path": {
+                                    "type": "string",
+                                    "description": "Path to the file to search"
+                                },
+                                "keywords": {
+                                    "type": "array",
+                                    "items": {"type": "string"},
+                                    "description": "Keywords to search for"
+                                }
+                            },
+                            "required": ["file_path", "keywords"]
+                        }
                     }
                 ]
             }
@@ -83,15 +127,24 @@ async def mcp_endpoint(req: Request):
             tool_name = params.get("name")
             tool_args = params.get("arguments", {})
             
-            if tool_name == "search_keyword":
+            if tool_name in ("search_keyword", "search_keywords"):
                 try:
-                    search_result = search_keyword_tool(tool_args)
+                    if tool_name == "search_keyword":
+                        found = await to_thread.run_sync(_keyword_search, tool_args)
+                        text = f"Found {len(found['texts'])} matches:\n" + \
+                            "\n".join([f"Line {line}: {line_text}" for line, line_text in zip(found['lines'], found['texts'])])
+                    else:
+                        search_result = await to_thread.run_sync(search_keywords_tool, tool_args)
+                        text = "\n\n".join(
+                            f"Found {r['count']} matches for '{kw}':\n" +
+                            "\n".join([f"Line {m['line']}: {m['text']}" for m in r['matches']])
+                            for kw, r in search_result['results'].items()
+                        )
                     result = {
                         "content": [
                             {
                                 "type": "text",
-                                "text": f"Found {search_result['count']} matches:\n" + 
-                                       "\n".join([f"Line {m['line']}: {m['text']}" for m in search_result['matches']])
+                                "text": text
                             }
                         ]
                     }
@@ -127,44 +180,123 @@ async def mcp_endpoint(req: Request):
             }
 
    
-    if not isinstance(body, dict):
-        raise HTTPException(status_code=400, detail={"error": "Invalid request body"})
-
-   
-    tool = body.get("tool")
-    args = body.get("args") or body.get("params") or {}
+    tool = body.tool
+    args = body.args or body.params or {}
 
     if not tool:
         raise HTTPException(status_code=400, detail={"error": "Missing 'tool' in request body"})
 
     if tool == "search_keyword":
-        return search_keyword_tool(args)
+        return await to_thread.run_sync(search_keyword_tool, args)
+    elif tool == "search_keywords":
+        return await to_thread.run_sync(search_keywords_tool, args)
     else:
         raise HTTPException(status_code=400, detail={"error": f"Unknown tool: {tool}"})
 
 
-def search_keyword_tool(args: Dict[str, Any]):
+class _ResultCache:
+    """Thread-safe LRU cache of search results, bounded by entry count and total result size."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[Tuple, Tuple[int, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Tuple, result: Dict[str, Any]) -> None:
+        """Store `result` unless it alone would take more than the byte budget."""
+        size = sum(sys.getsizeof(column) + sum(map(sys.getsizeof, column)) for column in result.values())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (size, result)
+            self.size += size
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                old_size, _ = self._entries.popitem(last=False)[1]
+                self.size -= old_size
+
+
+_search_cache = _ResultCache(max_entries=128, max_bytes=64 * 1024 * 1024)
+
+
+def _cached_search(path: str, mtime_ns: int, size: int, keyword: str,
+                   case_insensitive: bool, use_regex: bool, limit: Optional[int]) -> Dict[str, Any]:
+    """Memoized column-wise search results; treat the returned columns as read-only.
+
+    `mtime_ns` and `size` exist only to key the cache: any write to the file changes at
+    least one of them, so an edited file is searched again instead of served stale.
+    Results too large for the cache's byte budget are returned without being kept.
+    """
+    key = (path, mtime_ns, size, keyword, case_insensitive, use_regex, limit)
+    result = _search_cache.get(key)
+    if result is None:
+        found = search_in_file_columnar(path, keyword, case_insensitive=case_insensitive,
+                                        use_regex=use_regex, errors="ignore", limit=limit)
+        result = {"lines": tuple(found["lines"]), "texts": tuple(found["texts"])}
+        _search_cache.put(key, result)
+    return result
+
+
+def _keyword_search(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate `search_keyword` args and run the search, returning column-wise matches."""
     file_path = args.get("file_path")
     keyword = args.get("keyword")
     if not file_path or not keyword:
         raise HTTPException(status_code=400, detail={"error": "Missing 'file_path' or 'keyword' in args"})
 
+    limit = args.get("limit")
+    if limit is not None and (type(limit) is not int or limit < 1):
+        raise HTTPException(status_code=400, detail={"error": "'limit' must be a positive integer"})
+
     p = pathlib.Path(file_path)
     if not p.exists():
         raise HTTPException(status_code=400, detail={"error": f"File not found: {file_path}"})
 
-    matches: List[Dict[str, Any]] = []
     try:
-        with p.open("r", encoding="utf-8", errors="ignore") as f:
-            for i, line in enumerate(f, start=1):
-                if keyword.lower() in line.lower():
-                    matches.append({"line": i, "text": line.rstrip("\n")})
+        st = p.stat()
+        return _cached_search(str(p.resolve()), st.st_mtime_ns, st.st_size, keyword, True, False, limit)
     except Exception as e:
         raise HTTPException(status_code=500, detail={"error": str(e)})
 
+
+def search_keyword_tool(args: Dict[str, Any]):
+    found = _keyword_search(args)
+    matches = [{"line": line, "text": text} for line, text in zip(found["lines"], found["texts"])]
     return {"matches": matches, "count": len(matches)}
 
 
+def search_keywords_tool(args: Dict[str, Any]):
+    file_path = args.get("file_path")
+    keywords = args.get("keywords")
+    if not file_path or not keywords or not isinstance(keywords, list):
+        raise HTTPException(status_code=400, detail={"error": "Missing 'file_path' or 'keywords' in args"})
+
+    p = pathlib.Path(file_path)
+    if not p.exists():
+        raise HTTPException(status_code=400, detail={"error": f"File not found: {file_path}"})
+
+    try:
+        found = search_keywords_in_file(str(p), [str(kw) for kw in keywords], case_insensitive=True, errors="ignore")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail={"error": str(e)})
+
+    return {"results": {kw: {"matches": matches, "count": len(matches)} for kw, matches in found.items()}}
+
+
 if __name__ == "__main__":
     
     host = os.getenv("MCP_HOST", "127.0.0.1")
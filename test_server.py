@@ -6,9 +6,10 @@ Run with: pytest test_server.py -v
 """
 import pytest
 import tempfile
+import json
 import os
 from pathlib import Path
-from server import search_keyword_tool
+from server import search_keyword_tool, search_keywords_tool
 from fastapi import HTTPException
 
 
@@ -175,6 +176,66 @@ class TestSearchKeywordTool:
         finally:
             os.unlink(temp_path)
 
+    def test_search_multiple_keywords(self):
+        """Test batch search returns matches per keyword"""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8') as f:
+            f.write("Error: disk full\n")
+            f.write("warning: retrying\n")
+            f.write("ERROR again\n")
+            temp_path = f.name
+
+        try:
+            result = search_keywords_tool({
+                "file_path": temp_path,
+                "keywords": ["error", "warning", "absent"]
+            })
+
+            assert result["results"]["error"]["count"] == 2
+            assert [m["line"] for m in result["results"]["error"]["matches"]] == [1, 3]
+            assert result["results"]["warning"]["count"] == 1
+            assert result["results"]["absent"]["count"] == 0
+        finally:
+            os.unlink(temp_path)
+
+    def test_search_sees_file_changes(self):
+        """Test that repeated searches pick up edits to the file"""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8') as f:
+            f.write("keyword once\n")
+            temp_path = f.name
+
+        try:
+            args = {"file_path": temp_path, "keyword": "keyword"}
+            assert search_keyword_tool(args)["count"] == 1
+            assert search_keyword_tool(args)["count"] == 1
+
+            with open(temp_path, 'a', encoding='utf-8') as f:
+                f.write("keyword twice\n")
+            assert search_keyword_tool(args)["count"] == 2
+        finally:
+            os.unlink(temp_path)
+
+    def test_search_cache_is_bounded(self, monkeypatch):
+        """Test that the result cache stays within its byte budget"""
+        import server
+
+        cache = server._ResultCache(max_entries=128, max_bytes=64 * 1024)
+        monkeypatch.setattr(server, "_search_cache", cache)
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8') as f:
+            f.write("keyword line\n" * 5000)
+            f.write("rare entry\n")
+            temp_path = f.name
+
+        try:
+            # Too large to keep, but still returned in full.
+            assert search_keyword_tool({"file_path": temp_path, "keyword": "keyword"})["count"] == 5000
+            assert len(cache) == 0
+
+            assert search_keyword_tool({"file_path": temp_path, "keyword": "rare"})["count"] == 1
+            assert len(cache) == 1
+            assert cache.size <= cache.max_bytes
+        finally:
+            os.unlink(temp_path)
+
 
 class TestEdgeCases:
     """Test edge cases and special scenarios"""
@@ -232,6 +293,100 @@ class TestEdgeCases:
             os.unlink(temp_path)
 
 
+class TestMCPEndpoint:
+    """Test request parsing in the /mcp endpoint"""
+
+    @staticmethod
+    def post(content):
+        import anyio
+        import httpx
+        from server import app
+
+        async def main():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post("/mcp", content=content, headers={"Content-Type": "application/json"})
+
+        return anyio.run(main)
+
+    def test_invalid_body(self):
+        """Test that malformed JSON and non-object bodies are rejected with 400"""
+        for content in ['{"method": ', 'not json', '[1, 2]', '"tools/list"']:
+            response = self.post(content)
+            assert response.status_code == 400
+            assert response.json()["detail"] == {"error": "Invalid request body"}
+
+    def test_echoes_jsonrpc_and_id_as_sent(self):
+        """Test that jsonrpc and id of any JSON type are returned unchanged"""
+        for req_id in [1.0, [1, 2], "abc", None]:
+            response = self.post(json.dumps({"jsonrpc": 2, "id": req_id, "method": "initialize"}))
+            assert response.status_code == 200
+            body = response.json()
+            assert body["jsonrpc"] == 2
+            assert body["id"] == req_id and type(body["id"]) is type(req_id)
+
+    def test_legacy_args_fall_back_to_params(self):
+        """Test that the legacy form uses params when args is null"""
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8') as f:
+            f.write("has keyword\n")
+            temp_path = f.name
+
+        try:
+            response = self.post(json.dumps({
+                "tool": "search_keyword",
+                "args": None,
+                "params": {"file_path": temp_path, "keyword": "keyword"}
+            }))
+            assert response.status_code == 200
+            assert response.json()["count"] == 1
+        finally:
+            os.unlink(temp_path)
+
+
+class TestConcurrentRequests:
+    """Test that concurrent requests, which run in worker threads, do not interfere"""
+
+    def test_concurrent_tool_calls(self):
+        """Test several tools/call requests on different files served at once"""
+        import anyio
+        import httpx
+        from server import app
+
+        paths = []
+        for i in range(6):
+            with tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8') as f:
+                f.write(f"file {i} Keyword line\nfiller\n" * 20000)
+                paths.append(f.name)
+
+        async def call(client, path):
+            response = await client.post("/mcp", json={
+                "jsonrpc": "2.0", "id": path, "method": "tools/call",
+                "params": {"name": "search_keyword", "arguments": {"file_path": path, "keyword": "keyword"}}
+            })
+            return response.json()
+
+        async def main():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                results = [None] * len(paths)
+
+                async def run(i):
+                    results[i] = await call(client, paths[i])
+
+                async with anyio.create_task_group() as tg:
+                    for i in range(len(paths)):
+                        tg.start_soon(run, i)
+                return results
+
+        try:
+            for body in anyio.run(main):
+                assert "error" not in body
+                assert body["result"]["content"][0]["text"].startswith("Found 20000 matches:")
+        finally:
+            for path in paths:
+                os.unlink(path)
+
+
 if __name__ == "__main__":
    
     pytest.main([__file__, "-v"])
@@ -64,3 +64,237 @@ def test_search_regex():
         assert raised
     finally:
         os.remove(tmpname)
+
+
+def test_search_large_file_mmap():
+    # large enough to be memory-mapped rather than read in one go
+    filler = "filler line without the word\n" * 5000
+    content = filler + "Keyword in the middle\r\n" + filler + "last keyword"
+    with tempfile.NamedTemporaryFile('w', delete=False, encoding='utf-8', newline='') as t:
+        t.write(content)
+        tmpname = t.name
+
+    try:
+        res = search_in_file(tmpname, 'keyword', case_insensitive=True)
+        assert [m['line'] for m in res] == [5001, 10002]
+        assert res[0]['text'] == 'Keyword in the middle'
+        assert res[1]['text'] == 'last keyword'
+
+        assert len(search_in_file(tmpname, 'Keyword')) == 1
+    finally:
+        os.remove(tmpname)
+
+
+def test_search_keywords_single_pass(monkeypatch):
+    import search_tool
+
+    content = "alpha beta\nGamma\nbeta beta\nnothing\n"
+    with tempfile.NamedTemporaryFile('w', delete=False, encoding='utf-8') as t:
+        t.write(content)
+        tmpname = t.name
+
+    try:
+        expected = {kw: search_in_file(tmpname, kw, case_insensitive=True) for kw in ['beta', 'gamma', 'missing']}
+        res = search_tool.search_keywords_in_file(tmpname, ['beta', 'gamma', 'missing'], case_insensitive=True)
+        assert res == expected
+        assert [m['line'] for m in res['beta']] == [1, 3]
+
+        # same results without the optional Hyperscan and Aho-Corasick dependencies
+        monkeypatch.setattr(search_tool, 'hyperscan', None)
+        assert search_tool.search_keywords_in_file(tmpname, ['beta', 'gamma', 'missing'], case_insensitive=True) == expected
+        monkeypatch.setattr(search_tool, 'ahocorasick', None)
+        assert search_tool.search_keywords_in_file(tmpname, ['beta', 'gamma', 'missing'], case_insensitive=True) == expected
+    finally:
+        os.remove(tmpname)
+
+
+def test_search_case_insensitive_unicode_folds(monkeypatch):
+    import search_tool
+
+    # KELVIN SIGN lowercases to 'k' and 'İ' to 'i' plus a combining dot; 'ı' and 'ſ' stay as they are.
+    lines = ["filler"] * 5000 + ["\u212aelvin", "L\u0130NK", "l\u0131nk", "\u017fpeed"]
+    with tempfile.NamedTemporaryFile('w', delete=False, encoding='utf-8') as t:
+        t.write("\n".join(lines))
+        tmpname = t.name
+
+    try:
+        keywords = ['kelvin', 'li', 'speed']
+        expected = {kw: [{'line': i + 1, 'text': line} for i, line in enumerate(lines) if kw in line.lower()]
+                    for kw in keywords}
+        assert [len(expected[kw]) for kw in keywords] == [1, 1, 0]
+        for kw in keywords:
+            assert search_in_file(tmpname, kw, case_insensitive=True) == expected[kw]
+        assert search_tool.search_keywords_in_file(tmpname, keywords, case_insensitive=True) == expected
+        monkeypatch.setattr(search_tool, 'hyperscan', None)
+        assert search_tool.search_keywords_in_file(tmpname, keywords, case_insensitive=True) == expected
+        monkeypatch.setattr(search_tool, 'ahocorasick', None)
+        assert search_tool.search_keywords_in_file(tmpname, keywords, case_insensitive=True) == expected
+    finally:
+        os.remove(tmpname)
+
+
+def test_search_concurrent_threads():
+    import search_tool
+    from concurrent.futures import ThreadPoolExecutor
+
+    with tempfile.NamedTemporaryFile('w', delete=False, encoding='utf-8') as t:
+        t.write("some Keyword line\nfiller\n" * 5000)
+        tmpname = t.name
+
+    try:
+        # Scans sharing a cached Hyperscan database must not share its scratch space.
+        def search(i):
+            if i % 2:
+                return len(search_in_file(tmpname, 'keyword', case_insensitive=True))
+            return len(search_tool.search_keywords_in_file(tmpname, ['keyword', 'filler'], case_insensitive=True)['keyword'])
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            assert list(pool.map(search, range(16))) == [5000] * 16
+    finally:
+        os.remove(tmpname)
+
+
+def test_search_parallel_matches_serial(monkeypatch):
+    import search_tool
+
+    lines = [f"line {i} {'Keyword' if i % 7 == 0 else 'filler'}" for i in range(20000)]
+    with tempfile.NamedTemporaryFile('w', delete=False, encoding='utf-8') as t:
+        t.write("\n".join(lines))
+        tmpname = t.name
+    # A lone \r in a range without hits still shifts the line numbers of later ranges.
+    with tempfile.NamedTemporaryFile('wb', delete=False) as t:
+        t.write(b"progress 1%\rprogress 2%\n" + b"filler\n" * 20000 + b"needle here\n" + b"filler\n" * 20000)
+        cr_name = t.name
+
+    try:
+        monkeypatch.setattr(search_tool, 'PARALLEL_THRESHOLD', 0)
+        for ci in (False, True):
+            expected = search_in_file(tmpname, 'keyword', case_insensitive=ci)
+            res = search_tool.search_in_file_parallel(tmpname, 'keyword', case_insensitive=ci, workers=3)
+            assert res == expected
+        assert len(res) == len(range(0, 20000, 7))
+
+        res = search_tool.search_in_file_parallel(cr_name, 'needle', workers=2)
+        assert res == [{'line': 20003, 'text': 'needle here'}]
+    finally:
+        os.remove(tmpname)
+        os.remove(cr_name)
+
+
+def test_search_columnar():
+    from search_tool import search_in_file_columnar
+
+    content = "first line\nsecond keyword here\nthird line\nkeyword at end\n"
+    with tempfile.NamedTemporaryFile('w', delete=False, encoding='utf-8') as t:
+        t.write(content)
+        tmpname = t.name
+
+    try:
+        res = search_in_file_columnar(tmpname, 'keyword')
+        assert list(res['lines']) == [2, 4]
+        assert res['texts'] == ['second keyword here', 'keyword at end']
+    finally:
+        os.remove(tmpname)
+
+
+def test_search_limit():
+    lines = [f"line {i} {'Keyword' if i % 3 == 0 else 'filler'}" for i in range(30000)]
+    with tempfile.NamedTemporaryFile('w', delete=False, encoding='utf-8') as t:
+        t.write("\n".join(lines))
+        tmpname = t.name
+
+    try:
+        cases = [('Keyword', {}), ('keyword', {'case_insensitive': True}), ('Key.ord', {'use_regex': True})]
+        for keyword, kwargs in cases:
+            expected = search_in_file(tmpname, keyword, **kwargs)
+            assert search_in_file(tmpname, keyword, limit=5, **kwargs) == expected[:5]
+            assert search_in_file(tmpname, keyword, limit=len(expected) + 1, **kwargs) == expected
+    finally:
+        os.remove(tmpname)
+
+
+def test_search_dense_hits(monkeypatch):
+    import search_tool
+
+    lines = [f"row {i} {'Keyword' if i % 2 else 'filler'}" for i in range(3000)]
+    # An undecodable line that does not match must not fail the search.
+    content = "\r\n".join(lines[:1500]).encode('utf-8') + b"\nbad \xff\n" + "\n".join(lines[1500:]).encode('utf-8')
+    with tempfile.NamedTemporaryFile('wb', delete=False) as t:
+        t.write(content)
+        tmpname = t.name
+
+    try:
+        expected = [{'line': i + 1 + (i >= 1500), 'text': line} for i, line in enumerate(lines) if i % 2]
+        for block in (search_tool._BLOCK, 4096):
+            monkeypatch.setattr(search_tool, '_BLOCK', block)
+            assert search_in_file(tmpname, 'Keyword') == expected
+            assert search_in_file(tmpname, 'KEYWORD', case_insensitive=True) == expected
+            assert search_in_file(tmpname, 'Keyword', limit=1000) == expected[:1000]
+    finally:
+        os.remove(tmpname)
+
+
+def test_search_regex_literal_prefix(monkeypatch):
+    import re
+    import search_tool
+
+    lines = [f"row {i} {'ERROR code=' + str(i) if i % 50 == 0 else 'ok'}" for i in range(3000)]
+    content = "\r\n".join(lines[:1000]) + "\n" + "\r".join(lines[1000:1100]) + "\r" + "\n".join(lines[1100:])
+    with tempfile.NamedTemporaryFile('w', delete=False, encoding='utf-8', newline='') as t:
+        t.write(content)
+        tmpname = t.name
+
+    try:
+        # Small blocks and samples so lines straddle blocks and both block strategies are used.
+        monkeypatch.setattr(search_tool, '_BLOCK', 4096)
+        monkeypatch.setattr(search_tool, '_DENSITY_SAMPLE', 512)
+        for pattern in (r'ERROR code=\d+0$', r'\bERROR c', r'row \d+ ok'):
+            expected = [{'line': i + 1, 'text': line} for i, line in enumerate(lines) if re.search(pattern, line)]
+            assert search_in_file(tmpname, pattern, use_regex=True) == expected
+    finally:
+        os.remove(tmpname)
+
+
+def test_search_lone_carriage_return(monkeypatch):
+    import search_tool
+
+    # Progress bars rewrite a line with a bare \r; text mode counts each as a line break.
+    content = b"progress 10%\rprogress 100%\nkey here\r\nKEY again\n"
+    with tempfile.NamedTemporaryFile('wb', delete=False) as t:
+        t.write(content + b"filler line\n" * 8000)
+        tmpname = t.name
+
+    try:
+        expected = [{'line': 3, 'text': 'key here'}, {'line': 4, 'text': 'KEY again'}]
+        assert search_in_file(tmpname, 'key', case_insensitive=True) == expected
+        assert search_in_file(tmpname, 'key') == expected[:1]
+        assert search_in_file(tmpname, 'progress') == [{'line': 1, 'text': 'progress 10%'},
+                                                       {'line': 2, 'text': 'progress 100%'}]
+
+        assert search_tool.search_keywords_in_file(tmpname, ['key'], case_insensitive=True) == {'key': expected}
+        monkeypatch.setattr(search_tool, 'hyperscan', None)
+        assert search_tool.search_keywords_in_file(tmpname, ['key'], case_insensitive=True) == {'key': expected}
+
+        # Small files with a non-ASCII keyword are searched as one decoded string.
+        with open(tmpname, 'wb') as t:
+            t.write("clé 1\rclé 2\nnothing\r\nCLÉ 3\n".encode('utf-8'))
+        assert search_in_file(tmpname, 'clé', case_insensitive=True) == [
+            {'line': 1, 'text': 'clé 1'}, {'line': 2, 'text': 'clé 2'}, {'line': 4, 'text': 'CLÉ 3'}]
+    finally:
+        os.remove(tmpname)
+
+
+def test_search_regex_lines_longer_than_block(monkeypatch):
+    import search_tool
+
+    content = "x" * 1000 + " needle\r" + "y" * 500 + "\r\nneedle " + "z" * 700 + "\rnone\n"
+    with tempfile.NamedTemporaryFile('w', delete=False, encoding='utf-8', newline='') as t:
+        t.write(content)
+        tmpname = t.name
+
+    try:
+        monkeypatch.setattr(search_tool, '_BLOCK', 64)
+        res = search_in_file(tmpname, r'ne+dle', use_regex=True)
+        assert res == [{'line': 1, 'text': "x" * 1000 + " needle"}, {'line': 3, 'text': "needle " + "z" * 700}]
+    finally:
+        os.remove(tmpname)